@@ -1,7 +1,7 @@
 from cxr.math import Complex
 from cxr.math import Td
 from cxr.math import Htd
-from cxr.math import Seq, Sig, Matrix, Prism, x, std_l, set_std_l, SDP
+from cxr.math import Seq, ModSeq, Sig, SigBatch, Matrix, SparseMatrix, Prism, x, std_l, set_std_l, SDP
 from cxr.math import random_seq, random_matrix, g_prism_identity, simplex_identity
 from cxr.math import base64, set_chars64, htd
 
@@ -3,8 +3,8 @@ from cxr.math.base64 import set_chars64
 from cxr.math.complex import Complex
 from cxr.math.htd import Htd
 
-from cxr.math.snr import Seq, Sig, Matrix, Prism, x, std_l,\
-    set_std_l, signature_dot_product, g_prism_identity, simplex_identity,\
-    random_seq, random_matrix
+from cxr.math.snr import Seq, ModSeq, Sig, SigBatch, Matrix, SparseMatrix, Prism, x, std_l,\
+    set_std_l, set_ntt_threshold, set_matrix_workers, set_parallel_threshold, precision, signature_dot_product,\
+    g_prism_identity, simplex_identity, random_seq, random_matrix, crt
 
 SDP = signature_dot_product
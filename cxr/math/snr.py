@@ -1,12 +1,42 @@
 from cxr.math.base64 import Tridozenal as Td
 from cxr.math.complex import Complex
 from cxr.math import base64
+import collections
+import concurrent.futures
+import contextlib
+import decimal
+import fractions
+import functools
 import itertools
+import operator
+import os
 import random
+import sys
 
 std_l = 30
 NumTypes = (int, float, Td, Complex)
 
+# Length above which int convolution switches to the number-theoretic transform
+ntt_threshold = 50
+
+# Number of processes for int matrix products, and the number of output cells
+# below which a product stays in the current process
+matrix_workers = 1
+parallel_threshold = 40000
+
+# Exact context for the transform; decimal multiplies huge operands with a
+# three-prime number-theoretic transform and CRT reconstruction
+_ntt_context = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+# Longest signature function result kept in the cache used by Seq.f and Matrix.f
+_f_cache_limit = 1024
+
+# Longest power kept in the cache used by Seq.__pow__
+_pow_cache_limit = 1024
+
+# Number of coefficients kept by Seq arithmetic, or -1 to keep all of them
+_precision = -1
+
 def set_std_l(n: int):
     global std_l
     if n > 0:
@@ -14,6 +44,409 @@ def set_std_l(n: int):
     return std_l
 
 
+def set_ntt_threshold(n: int):
+    global ntt_threshold
+    if n > 0:
+        ntt_threshold = n
+    return ntt_threshold
+
+
+def set_matrix_workers(n: int):
+    global matrix_workers
+    if n > 0:
+        matrix_workers = n
+    return matrix_workers
+
+
+def set_parallel_threshold(n: int):
+    global parallel_threshold
+    if n >= 0:
+        parallel_threshold = n
+    return parallel_threshold
+
+
+@contextlib.contextmanager
+def precision(n: int):
+    """
+    Treats every Seq inside the block as a power series known only up to x^n
+
+    Products, powers, sums, deconvolution and square roots then compute
+    only their first n coefficients instead of computing the full result
+    and discarding the tail.
+
+    :param n: the number of coefficients to keep
+    """
+    global _precision
+    previous = _precision
+    _precision = n
+    try:
+        yield n
+    finally:
+        _precision = previous
+
+
+def _is_int_list(lst: list) -> bool:
+    """
+    Whether every element of the list is a plain int
+
+    Plain ints are the common case for signatures, and lists of them
+    can be handed to the builtin map/sum machinery without any of the
+    type juggling required for Td or Complex elements.
+    """
+    for e in lst:
+        if type(e) is not int:
+            return False
+    return True
+
+
+def _add_ints(a: list, b: list) -> list:
+    """
+    Elementwise sum of two int lists of possibly different lengths
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    out = list(map(operator.add, a, b))
+    out.extend(a[len(b):])
+    return out
+
+
+def _trim_ints(a: list) -> list:
+    """
+    Copy of an int list without its trailing zeroes
+    """
+    n = len(a)
+    while n and not a[n - 1]:
+        n -= 1
+    return a[:n]
+
+
+def _school_mul_ints(a: list, b: list, l: int=-1) -> list:
+    """
+    Schoolbook convolution of two non-empty int lists
+
+    Each coefficient is a single sum over a pair of slices,
+    so the inner loop runs inside the interpreter's builtins.
+
+    :param l: the number of coefficients to compute, or -1 for all of them
+    """
+    rb = b[::-1]
+    l_a, l_b = len(a), len(b)
+    length = l_a + l_b - 1
+    if 0 <= l < length:
+        length = l
+    out = []
+    for n in range(length):
+        lo = n - l_b + 1 if n >= l_b else 0
+        hi = n + 1 if n < l_a else l_a
+        start = l_b - 1 - n + lo
+        out.append(sum(map(operator.mul, a[lo:hi], rb[start:start + hi - lo])))
+    return out
+
+
+def _ntt_mul_ints(a: list, b: list) -> list:
+    """
+    Exact convolution of two non-empty int lists via Kronecker substitution
+
+    Both lists are packed into a single decimal number with one fixed-width
+    slot per coefficient, wide enough that no product coefficient can
+    overflow into its neighbour. The packed numbers are then multiplied by
+    decimal, which uses a number-theoretic transform for large operands,
+    and the slots of the product are read back out.
+    """
+    bound = max(map(abs, a)) * max(map(abs, b)) * min(len(a), len(b))
+    width = bound.bit_length() * 30103 // 100000 + 2
+    max_digits = sys.get_int_max_str_digits() if hasattr(sys, "get_int_max_str_digits") else 0
+    if max_digits and width >= max_digits:
+        return _binary_mul_ints(a, b, bound)
+
+    def pack(lst):
+        fmt = f"0{width}d"
+        pos = "".join([format(e if e > 0 else 0, fmt) for e in reversed(lst)])
+        neg = "".join([format(-e if e < 0 else 0, fmt) for e in reversed(lst)])
+        return _ntt_context.subtract(decimal.Decimal(pos), decimal.Decimal(neg))
+
+    l = len(a) + len(b) - 1
+    half = 5 * 10 ** (width - 1)
+
+    # Offsetting every slot by half the slot size keeps all slots non-negative
+    offset = decimal.Decimal(("5" + "0" * (width - 1)) * l)
+    product = _ntt_context.add(_ntt_context.multiply(pack(a), pack(b)), offset)
+    digits = str(product).rjust(width * l, "0")
+    end = width * l
+    return [int(digits[k - width:k]) - half for k in range(end, 0, -width)]
+
+
+def _binary_mul_ints(a: list, b: list, bound: int) -> list:
+    """
+    Kronecker substitution in binary, used when the coefficients are too
+    large to round-trip through decimal strings
+    """
+    width = (bound.bit_length() + 8) // 8
+    shift = width * 8
+
+    def pack(lst):
+        pos = b"".join([(e if e > 0 else 0).to_bytes(width, "little") for e in lst])
+        neg = b"".join([(-e if e < 0 else 0).to_bytes(width, "little") for e in lst])
+        return int.from_bytes(pos, "little") - int.from_bytes(neg, "little")
+
+    l = len(a) + len(b) - 1
+    data = (pack(a) * pack(b)).to_bytes(width * l + 1, "little", signed=True)
+    half = 1 << (shift - 1)
+    full = 1 << shift
+    carry = 0
+    out = []
+    for k in range(0, width * l, width):
+        c = int.from_bytes(data[k:k + width], "little") + carry
+        if c >= half:
+            c -= full
+            carry = 1
+        else:
+            carry = 0
+        out.append(c)
+    return out
+
+
+def _mul_ints(a: list, b: list, l: int=-1) -> list:
+    """
+    Convolution of two non-empty int lists, choosing the kernel by size
+
+    :param l: the number of coefficients to compute, or -1 for all of them
+    """
+    if l >= 0:
+        a, b = a[:l], b[:l]
+    if len(a) < ntt_threshold or len(b) < ntt_threshold:
+        return _school_mul_ints(a, b, l)
+    out = _ntt_mul_ints(a, b)
+    return out[:l] if l >= 0 else out
+
+
+def _pow_ints(elements: tuple, power: int, l: int) -> tuple:
+    """
+    The first l coefficients of a positive power of an int sequence,
+    or all of them if l is -1
+
+    Results of up to _pow_cache_limit terms are cached, since the same signatures
+    are raised to the same powers over and over while building prisms. Longer
+    results are not kept, as their terms grow without bound.
+    """
+    length = power * (len(elements) - 1) + 1
+    if 0 <= l < length:
+        length = l
+    if length > _pow_cache_limit:
+        return _power_ints(elements, power, l)
+    return _cached_power_ints(elements, power, l)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_power_ints(elements: tuple, power: int, l: int) -> tuple:
+    return _power_ints(elements, power, l)
+
+
+def _power_ints(elements: tuple, power: int, l: int) -> tuple:
+    length = power * (len(elements) - 1) + 1
+    if 0 <= l < length:
+        length = l
+
+    # A single term c*x^k raises to c^p * x^kp, which is just a shift
+    nonzero = [k for k in range(len(elements)) if elements[k]]
+    if not nonzero:
+        return 0,
+    elif len(nonzero) == 1:
+        out = [0] * length
+        if nonzero[0] * power < length:
+            out[nonzero[0] * power] = elements[nonzero[0]] ** power
+        return tuple(out)
+
+    a = list(elements)
+    out = None
+    while power:
+        if power & 1:
+            out = a if out is None else _mul_ints(out, a, l)
+        power >>= 1
+        if power:
+            a = _mul_ints(a, a, l)
+    out.extend([0] * (length - len(out)))
+    return tuple(out[:length])
+
+
+def _f_ints(d: list, r: list, l: int) -> list:
+    """
+    Continues the int sequence r with the signature d up to length l
+    """
+    rd = d[::-1]
+    n = len(d)
+    r = list(r)
+    for k in range(len(r), l):
+        r.append(sum(map(operator.mul, rd[max(n - k, 0):], r[max(k - n, 0):k])))
+    return r
+
+
+def _signature_function_ints(d: tuple, l: int) -> tuple:
+    """
+    The first l terms of F_d for an int signature
+
+    Results of up to _f_cache_limit terms are cached, since Matrix.f asks for the
+    same F_g for every matrix of a given length. Longer results are not kept, as
+    their terms grow without bound.
+    """
+    if l > _f_cache_limit:
+        return tuple(_f_ints(list(d), [1], l))
+    return _cached_signature_function_ints(d, l)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_signature_function_ints(d: tuple, l: int) -> tuple:
+    return tuple(_f_ints(list(d), [1], l))
+
+
+def _inverse_ints(b: list, l: int) -> list:
+    """
+    The first l coefficients of 1/b for an int list beginning with 1 or -1
+
+    Uses Newton iteration, r <- r + r(1 - br), which doubles the number
+    of correct coefficients at every step, so the whole reciprocal costs
+    a constant multiple of a single length-l multiplication.
+    """
+    r = [b[0]]
+    while len(r) < l:
+        k = len(r)
+        n = min(2 * k, l)
+
+        # b * r is 1 up to x^k, so only its tail contributes to the correction
+        tail = [-e for e in _mul_ints(b[:n], r, n)[k:]]
+        correction = _mul_ints(r, tail, n - k) if tail else []
+        correction.extend([0] * (n - k - len(correction)))
+        r.extend(correction)
+    return r
+
+
+def _inverse_mod(b: list, l: int, m: int) -> list:
+    """
+    The first l coefficients of 1/b modulo m, by the same Newton
+    iteration as _inverse_ints
+
+    The leading coefficient of b must be invertible modulo m.
+    """
+    r = [pow(b[0], -1, m)]
+    while len(r) < l:
+        k = len(r)
+        n = min(2 * k, l)
+        tail = [-e % m for e in _mul_ints(b[:n], r, n)[k:]]
+        correction = [e % m for e in _mul_ints(r, tail, n - k)] if tail else []
+        correction.extend([0] * (n - k - len(correction)))
+        r.extend(correction)
+    return r
+
+
+def _sig_add_ints(a: list, b: list) -> list:
+    """
+    Signature addition a + b - xab of two nonzero int lists, respecting the current precision
+    """
+    if 0 < _precision < max(len(a), len(b)):
+        a, b = a[:_precision], b[:_precision]
+    # The product is shifted by one place
+    out = _add_ints(a, b)
+    if _precision != 1:
+        product = _mul_ints(a, b, _precision - 1 if _precision > 0 else -1)
+        out.extend([0] * (len(product) + 1 - len(out)))
+        out[1:len(product) + 1] = map(operator.sub, out[1:len(product) + 1], product)
+    return out
+
+
+def _compose(coeffs: list, y: "Seq", l: int) -> "Seq":
+    """
+    The first l terms of the composition c(y) for a series y without a constant term
+
+    The coefficients are split in halves around the repeated squares of y, which costs
+    a logarithmic number of full-length products rather than one per coefficient.
+    Must be called inside a precision(l) block.
+    """
+    coeffs = coeffs[:l] if l > 0 else coeffs[:1]
+    # squares[j] is y^(2^j)
+    squares = [y]
+    while 2 ** len(squares) < len(coeffs):
+        squares.append(squares[-1] * squares[-1])
+
+    def compose(lo, hi, j):
+        if hi - lo == 1:
+            return Seq(coeffs[lo])
+        mid = lo + 2 ** (j - 1)
+        if mid >= hi:
+            return compose(lo, hi, j - 1)
+        return compose(lo, mid, j - 1) + compose(mid, hi, j - 1) * squares[j - 1]
+
+    return compose(0, len(coeffs), len(squares))
+
+
+def _horner_ints(digits: list, b: int) -> int:
+    """
+    The value of int digits in base b, most significant first
+
+    Long lists are split in halves, value(high) * b^len(low) + value(low), so that
+    the big multiplications are balanced rather than growing by one digit at a time.
+    """
+    if len(digits) <= 64:
+        return functools.reduce(lambda h, d: h * b + d, digits, 0)
+    mid = len(digits) // 2
+    return _horner_ints(digits[:mid], b) * b ** (len(digits) - mid) + _horner_ints(digits[mid:], b)
+
+
+def _band_products(rows: list, bands: list, width: int) -> list:
+    """
+    Rows of the product of int rows with a matrix given as (start, column) bands, padded to width
+    """
+    padding = [0] * (width - len(bands))
+    return [[sum(map(operator.mul, row[start:start + len(c)], c)) if start < len(row) else 0 for start, c in bands] + padding
+            for row in rows]
+
+
+def _td_fraction(t: Td) -> fractions.Fraction:
+    """
+    The exact value of a Td, from its integer and mantissa digits
+    """
+    out = fractions.Fraction(sum(t.integer[k] * t.base ** k for k in range(len(t.integer))))
+    out += sum(fractions.Fraction(t.mantissa[k], t.base ** (k + 1)) for k in range(len(t.mantissa)))
+    return -out if t.is_negative else out
+
+
+def _riordan_columns_ints(s: list, d: list, l: int):
+    """
+    Yields the columns k = 1, ..., l - 1 of the int Riordan array from rows k to l - 1
+
+    The rows satisfy T[n][k] = sum(A[j] * T[n-1][k-1+j]) with A = d reversed, so
+    f = xA(f) and column k is f^(k-1) times the second column. Each column then
+    costs one truncated product instead of a dot product per entry.
+    """
+    a = d[::-1]
+    pad = lambda e, n: e[:n] + [0] * (n - len(e))
+
+    # Newton iteration on f - xA(f) = 0, doubling the number of known terms
+    f = Seq._of([0, a[0]])
+    da = [(j + 1) * a[j + 1] for j in range(len(a) - 1)] or [0]
+    n = 2
+    while n < l:
+        n = min(2 * n, l)
+        with precision(n):
+            residual = f - Seq._of([0] + _compose(a, f, n).elements)
+            derivative = Seq(1) - Seq._of([0] + _compose(da, f, n).elements)
+            f = f - residual * Seq._of(_inverse_ints(pad(derivative.elements, n), n))
+    f = pad(f.elements, l)[1:]
+
+    # The second column over x is g(f/x) + delta/(1 - xZ(f)), where delta corrects
+    # the seeded row [s1, s0*d0] and Z(t) = (A(t) - A(0))/t
+    g = pad([1] + s[1:], l - 1)
+    delta = (s[0] if s else 0) * d[0] - a[0]
+    with precision(l - 1):
+        z = Seq(1) - Seq._of([0] + _compose(a[1:] or [0], Seq._of([0] + f), l - 1).elements)
+        z = pad(z.elements, l - 1)
+    column = [e + delta * r for e, r in zip(_mul_ints(g, f, l - 1), pad(_inverse_ints(z, l - 1), l - 1))]
+    for k in range(1, l):
+        column = pad(column, l - k)
+        yield column
+        if k < l - 1:
+            column = _mul_ints(column[:l - k - 1], f, l - k - 1) if any(column[:l - k - 1]) else [0]
+
+
 def check_seq(f):
     """
     Auxiliary method which checks inputs to Seq methods
@@ -23,7 +456,9 @@ def check_seq(f):
     :param f: the function to be decorated
     """
     def wrapper(self, o=None):
-        if o is None:
+        if type(o) is Seq:
+            return f(self, o)
+        elif o is None:
             return f(self, None)
         elif isinstance(o, NumTypes):
             return f(self, Seq(o))
@@ -55,7 +490,9 @@ def check_sig(f):
     """
 
     def wrapper(self, o):
-        if o is None:
+        if type(o) is Sig:
+            return f(self, o)
+        elif o is None:
             return f(self, Sig(Seq()))
         elif isinstance(o, NumTypes):
             return f(self, Sig(Seq(o)))
@@ -65,7 +502,7 @@ def check_sig(f):
                     raise ValueError(f"Unsupported type {type(e)}")
             return f(self, Sig(Seq(o)))
         elif isinstance(o, Seq):
-            return f(self, Sig(o))
+            return f(self, Sig._of(o))
         elif isinstance(o, Sig):
             return f(self, o)
         else:
@@ -80,6 +517,9 @@ class Seq:
     addition and convolution as operations.
     """
 
+    # Incremented by every in-place change, so that matrices can tell when a cached row has changed
+    _version = 0
+
     @staticmethod
     def __validate(lst: list[NumTypes]) -> bool:
         """
@@ -113,6 +553,9 @@ class Seq:
         elif isinstance(elements, NumTypes):
             self.elements = [elements]
         elif isinstance(elements, (list, tuple)):
+            if _is_int_list(elements):
+                self.elements = list(elements)
+                return
             self.elements = []
             Seq.__validate(elements)
             for v in elements:
@@ -129,11 +572,28 @@ class Seq:
         else:
             raise ValueError(f"Unsupported type {type(elements).__name__}")
 
+    @staticmethod
+    def _of(elements: list) -> "Seq":
+        """
+        Internal constructor which adopts an already valid list without copying or checking it
+
+        The public constructor validates and normalises every element, which dominates
+        the cost of arithmetic on short sequences. Results of the int kernels are
+        fresh lists of plain ints, so they can be wrapped directly.
+        """
+        out = object.__new__(Seq)
+        out.elements = elements
+        return out
+
     @check_seq
     def __add__(self, o) -> "Seq":
         if isinstance(o, NumTypes):
             return self + Seq(o)
         elif isinstance(o, Seq):
+            if _precision >= 0 and max(len(self), len(o)) > _precision:
+                return Seq._of(self.elements[:_precision]) + Seq._of(o.elements[:_precision])
+            if _is_int_list(self.elements) and _is_int_list(o.elements):
+                return Seq._of(_add_ints(self.elements, o.elements))
             length = max(len(self), len(o))
             out = [self[k] + o[k] for k in range(length)]
             return Seq(out)
@@ -144,6 +604,8 @@ class Seq:
     def __eq__(self, o):
         if o is None or not isinstance(o, Seq):
             return False
+        elif _is_int_list(self.elements) and _is_int_list(o.elements):
+            return (_trim_ints(self.elements) or self.elements[:1]) == (_trim_ints(o.elements) or o.elements[:1])
         elif len(self.trim()) != len(o.trim()):
             return False
         return all(self[k] == o[k] for k in range(len(self.trim())))
@@ -176,8 +638,10 @@ class Seq:
             step = i.step if i.step is not None else 1
             if step < 0:
                 start, stop = stop - 1, start - 1
+            if step == 1 and 0 <= start and stop <= len(self):
+                return Seq._of(self.elements[start:stop])
             zero = Td.zero(self.base()) if self.is_td() else 0
-            return Seq([self.elements[k] if len(self) > k >= 0 else zero for k in range(start, stop, step)])
+            return Seq._of([self.elements[k] if len(self) > k >= 0 else zero for k in range(start, stop, step)])
 
     @check_seq
     def __gt__(self, o):
@@ -222,6 +686,12 @@ class Seq:
             return o * self
         elif isinstance(o, NumTypes):
             return Seq([a * o for a in self])
+        elif _precision >= 0 and max(len(self), len(o)) > _precision:
+            return Seq._of(self.elements[:_precision]) * Seq._of(o.elements[:_precision])
+        elif self.elements and o.elements and _is_int_list(self.elements) and _is_int_list(o.elements):
+            if not any(self.elements) or not any(o.elements):
+                return Seq(0)
+            return Seq._of(_mul_ints(self.elements, o.elements, _precision))
         elif self == Seq(0) or o == Seq(0) or (self.is_td() and self == Seq(Td.zero(self.base()))) or (o.is_td() and self == Seq(Td.zero(o.base()))):
             return Seq(Td.zero(self.base()) if self.is_td() else 0)
         elif len(self) < 25 and len(o) < 25:
@@ -266,7 +736,11 @@ class Seq:
             return o * self
         elif isinstance(o, NumTypes):
             return Seq([a * o for a in self])
+        elif self.elements and o.elements and _is_int_list(self.elements) and _is_int_list(o.elements):
+            return Seq._of(_school_mul_ints(self.elements, o.elements, _precision))
         length = len(self) + len(o) - 1
+        if 0 <= _precision < length:
+            length = _precision
         r = [sum(self[k] * o[n - k] for k in range(n + 1)) for n in range(length)]
         return Seq(r)
 
@@ -274,13 +748,22 @@ class Seq:
         return self.neg()
 
     def __pow__(self, power, modulo=None):
+        if power <= 0:
+            return Seq(Td.one(self.base()) if self.is_td() else 1)
+        elif not self.elements:
+            return Seq()
+        elif _is_int_list(self.elements):
+            return Seq._of(list(_pow_ints(tuple(self.elements), power, _precision)))
+
+        # Square-and-multiply
         a = Seq(self)
-        if self.is_td():
-            out = Seq(Td.one(self.base()))
-        else:
-            out = Seq(1)
-        for k in range(power):
-            out *= a
+        out = None
+        while power:
+            if power & 1:
+                out = a if out is None else out * a
+            power >>= 1
+            if power:
+                a *= a
         return out
 
     @check_seq
@@ -297,6 +780,7 @@ class Seq:
 
     def __setitem__(self, key: int, value: NumTypes):
         self.elements[key] = value
+        self._version += 1
 
     @check_seq
     def __sub__(self, o):
@@ -331,11 +815,19 @@ class Seq:
         elif len(temp_self) == 0:
             return Seq(0)
 
+        # Series with a unit leading coefficient have an exact integer reciprocal
+        if temp_o[0] in (1, -1) and _is_int_list(temp_self.elements) and _is_int_list(temp_o.elements):
+            length = _precision if _precision >= 0 else std_l
+            r = _inverse_ints(temp_o.elements, length)
+            return Seq._of(_mul_ints(temp_self.elements, r, length)).trim()
+
         r = Seq(temp_self[0]/temp_o[0])
 
         # Tds are computationally expensive, so limit their size
         if isinstance(r[0], Td):
             length = max([len(temp_self), len(temp_o)])
+        elif _precision >= 0:
+            length = _precision
         else:
             length = std_l
         for n in range(1, length):
@@ -368,6 +860,7 @@ class Seq:
             if isinstance(self.elements[0], (int, float)) and not isinstance(v, (int, float)):
                 raise ValueError(f"Seq contains {type(self.elements[0]).__name__}, not {type(v).__name__}")
         self.elements.append(int(v) if int(v) == v else v)
+        self._version += 1
 
     def base(self) -> int:
         if self.is_td():
@@ -379,6 +872,8 @@ class Seq:
         return Seq(self.elements + other.elements)
 
     def dot_product(self, other: "Seq") -> int:
+        if not self.is_td():
+            return sum(map(operator.mul, self, other))
         l = min(len(self), len(other))
         out = Td.zero(self.base()) if self.is_td() else 0
         for i in range(l):
@@ -389,6 +884,8 @@ class Seq:
         """
         The results of Matrix.dot_product without being summed at the end
         """
+        if not self.is_td():
+            return Seq(list(map(operator.mul, self, other)))
         l = min(len(self), len(other))
         out = Seq()
         for i in range(l):
@@ -405,6 +902,11 @@ class Seq:
         """
         if l == -1:
             l = std_l
+        if _is_int_list(self.elements):
+            if not seed:
+                return Seq._of(list(_signature_function_ints(tuple(self.elements), l)))
+            elif _is_int_list(Seq(seed).elements):
+                return Seq._of(_f_ints(self.elements, Seq(seed).elements, l))
         if seed:
             r = Seq(seed)
         else:
@@ -426,37 +928,106 @@ class Seq:
             r.append(n)
         return r
 
+    def f_nth(self, n: int, seed=None, modulus: int=None) -> NumTypes:
+        """
+        The n-th term of the signature function, computed without
+        generating the terms before it
+
+        Past the seed, F_d satisfies a linear recurrence of order len(d), so
+        its n-th term is a combination of len(d) known terms whose weights
+        are the coefficients of x^n reduced modulo the characteristic
+        polynomial of d. Those are found by square-and-multiply.
+
+        :param n: the index of the term
+        :param seed: an alternate beginning to the sequence
+        :param modulus: if given, the term is computed modulo this number
+        :return: the term F_d(n)
+        """
+        m = len(self)
+        l_seed = len(seed) if seed else 1
+        start = max(l_seed, m)
+
+        def reduce(v):
+            return v % modulus if modulus else v
+
+        if n < start + m or m == 0:
+            if m == 0 and n >= l_seed:
+                return reduce(Td.zero(self.base()) if self.is_td() else 0)
+            return reduce(self.f(l=n + 1, seed=seed)[n])
+
+        # From index start onwards every term uses the full recurrence, so
+        # shift the sequence to begin m terms before that point
+        shift = start - m
+        initial = self.f(l=start, seed=seed)[shift:start]
+        d = self.elements
+        is_int = _is_int_list(d) and _is_int_list(initial.elements)
+        zero = Td.zero(self.base()) if self.is_td() else 0
+
+        def mul_mod(a, b):
+            if is_int:
+                p = _mul_ints(a, b)
+            else:
+                p = (Seq(a) * Seq(b)).elements
+
+            # x^m is congruent to d[0]x^(m-1) + d[1]x^(m-2) + ... + d[m-1]
+            for i in range(len(p) - 1, m - 1, -1):
+                c = p[i]
+                if c != 0:
+                    for k in range(m):
+                        p[i - 1 - k] += c * d[k]
+            return [reduce(c) for c in p[:m]]
+
+        result = [Td.one(self.base()) if self.is_td() else 1]
+        power = [zero, result[0]]
+        e = n - shift
+        while e:
+            if e & 1:
+                result = mul_mod(result, power)
+            e >>= 1
+            if e:
+                power = mul_mod(power, power)
+
+        out = zero
+        for c, u in zip(result, initial):
+            out += c * u
+        return reduce(out)
+
     def f_generator(self, l: int=-1, seed = None):
         """
-        The recursive signature function
+        The recursive signature function as a stream of terms
 
-        :param l: the length of the sequence
+        Only the last len(d) terms are kept, so memory stays
+        bounded however many terms are consumed.
+
+        :param l: the length of the sequence, or None for an endless stream
         :param seed: an alternate beginning to the sequence
-        :return: the sequence F_d
+        :return: a generator of the terms of F_d which follow the seed
         """
         if l == -1:
             l = std_l
         if seed:
-            r = Seq(seed)
+            r = Seq(seed).elements
         else:
             if self.is_td():
-                r = Seq(Td.one(self.base()))
+                r = [Td.one(self.base())]
             else:
-                r = Seq(1)
-        l_r = len(r)
-        for x in range(l_r, l):
-            if self.is_td():
-                n = Td.zero(self.base())
+                r = [1]
+        d = self.elements
+        is_int = _is_int_list(d) and _is_int_list(r)
+        window = collections.deque(r[max(len(r) - len(d), 0):] if d else [], maxlen=len(d))
+        x = len(r)
+        while l is None or x < l:
+            if is_int:
+                n = sum(map(operator.mul, d, reversed(window)))
             else:
-                n = 0
-            for k in range(len(self)):
-                if x-k-1 < 0:
-                    break
-                else:
-                    n += self[k] * r[x-k-1]
-            r.append(n)
+                n = Td.zero(self.base()) if self.is_td() else 0
+                for k in range(min(len(d), len(window))):
+                    n += d[k] * window[-k - 1]
+                if isinstance(n, float) and int(n) == n:
+                    n = int(n)
+            window.append(n)
+            x += 1
             yield n
-        return r
 
     def i(self) -> "Seq":
         """
@@ -470,6 +1041,12 @@ class Seq:
                 raise ValueError(f"non-invertible: Td is {self[0]}, not 1")
         elif self[0] != 1:
             raise ValueError("non-invertible: arg d must begin with 1")
+
+        # F_d = 1 / (1 - xd), so the signature is read off the reciprocal of F_d
+        if len(self) > 1 and _is_int_list(self.elements):
+            inverse = _inverse_ints(self.elements, len(self))
+            return Seq([-e for e in inverse[1:]]).trim()
+
         r = Seq(self[1])
         for x in range(2, len(self)):
             n = self[x]
@@ -478,6 +1055,64 @@ class Seq:
             r.append(n)
         return r.trim()
 
+    def recurrence(self, modulus: int=None) -> "Seq":
+        """
+        Finds the shortest signature d for which the sequence satisfies
+        a(n) = d[0]a(n-1) + ... + d[k-1]a(n-k) from n = k onwards,
+        using the Berlekamp-Massey algorithm
+
+        Unlike i(), the sequence may have any beginning, and the returned
+        signature is as short as possible. A recurrence of length k is
+        only determined by the sequence once it has at least 2k terms.
+
+        :param modulus: a prime; if given, the recurrence is found over the integers mod p
+        :return: the signature, or None if the sequence is too short to determine one
+        """
+        values = [_td_fraction(e) if isinstance(e, Td) else e for e in self]
+        if modulus:
+            s = [int(e) % modulus for e in values]
+
+            def divide(a, b):
+                return a * pow(b, -1, modulus) % modulus
+        else:
+            s = [fractions.Fraction(e) for e in values]
+
+            def divide(a, b):
+                return a / b
+
+        c, b = [1], [1]
+        length, gap, last = 0, 1, 1
+        for n in range(len(s)):
+            discrepancy = s[n]
+            for i in range(1, length + 1):
+                discrepancy += c[i] * s[n - i]
+            if modulus:
+                discrepancy %= modulus
+            if discrepancy == 0:
+                gap += 1
+                continue
+
+            coef = divide(discrepancy, last)
+            t = list(c)
+            c.extend([0] * (len(b) + gap - len(c)))
+            for i in range(len(b)):
+                c[i + gap] -= coef * b[i]
+                if modulus:
+                    c[i + gap] %= modulus
+            if 2 * length <= n:
+                length, b, last, gap = n + 1 - length, t, discrepancy, 1
+            else:
+                gap += 1
+
+        if 2 * length > len(s):
+            return None
+        c.extend([0] * (length + 1 - len(c)))
+        out = [(-e) % modulus if modulus else -e for e in c[1:length + 1]]
+        if not modulus:
+            out = [int(e) if e.denominator == 1 else float(e) for e in out]
+        out = Seq(out) if out else Seq(0)
+        return out.td(self.base()) if self.is_td() and _is_int_list(out.elements) else out
+
     def is_td(self) -> bool:
         if len(self) == 0:
             return False
@@ -488,7 +1123,7 @@ class Seq:
         Converts the given sequence to its additive inverse
         """
         out = [-k for k in self]
-        return Seq(out)
+        return Seq._of(out) if _is_int_list(out) else Seq(out)
 
     def polynomial(self, var: str="x", fps: bool=False, use_ss: bool=False) -> str:
         """
@@ -533,6 +1168,7 @@ class Seq:
         return output
 
     def pop(self, index: int=0):
+        self._version += 1
         return self.elements.pop(index)
 
     def reverse(self) -> "Seq":
@@ -548,7 +1184,7 @@ class Seq:
         :return: the square root
         """
         if l == -1:
-            l = std_l
+            l = _precision if _precision >= 0 else std_l
         output = Seq(self[0].root(2) if self.is_td() else float(Td(self[0], base=10).root(2)))
         for n in range(1, l):
             _diff = self[n]
@@ -632,6 +1268,9 @@ class Seq:
 
         :param to_zero: Whether to reduce the sequence to at most length 1 (False) or length 0 (True)
         """
+        if _is_int_list(self.elements):
+            out = _trim_ints(self.elements)
+            return Seq._of(out if out or to_zero else self.elements[:1])
         out = list(self.elements)
         while len(out) > (0 if to_zero else 1):
             current_val = out[-1]
@@ -663,6 +1302,156 @@ class Seq:
 x = Seq(0, 1)
 
 
+class ModSeq(Seq):
+    """
+    A Seq of integers modulo m
+
+    Every operation reduces its result, so intermediate values stay
+    bounded by the modulus however far a recurrence is carried.
+    """
+
+    def __init__(self, *elements, modulus: int):
+        super().__init__(*elements)
+        if not _is_int_list(self.elements):
+            raise TypeError("ModSeq elements must be int")
+        if modulus < 2:
+            raise ValueError(f"Modulus must be 2 or greater, not {modulus}")
+        self.modulus = modulus
+        self.elements = [e % modulus for e in self.elements]
+
+    @staticmethod
+    def _of(elements: list, modulus: int) -> "ModSeq":
+        """
+        Internal constructor which adopts a list of already reduced ints without copying or checking it
+        """
+        out = object.__new__(ModSeq)
+        out.elements = elements
+        out.modulus = modulus
+        return out
+
+    def __check_modulus(self, o):
+        if isinstance(o, ModSeq) and o.modulus != self.modulus:
+            raise ValueError(f"Modulus mismatch: {self.modulus} and {o.modulus}")
+
+    @check_seq
+    def __add__(self, o):
+        self.__check_modulus(o)
+        return ModSeq(Seq.__add__(self, o), modulus=self.modulus)
+
+    def __getitem__(self, i):
+        out = Seq.__getitem__(self, i)
+        if isinstance(out, Seq):
+            return ModSeq(out, modulus=self.modulus)
+        return out
+
+    @check_seq
+    def __mul__(self, o):
+        if isinstance(o, Matrix):
+            return o * self
+        self.__check_modulus(o)
+        return ModSeq(Seq.__mul__(self, o), modulus=self.modulus)
+
+    def __pow__(self, power, modulo=None):
+        out = ModSeq(1, modulus=self.modulus)
+        a = self
+        while power > 0:
+            if power & 1:
+                out *= a
+            power >>= 1
+            if power:
+                a *= a
+        return out
+
+    @check_seq
+    def __truediv__(self, o):
+        self.__check_modulus(o)
+        m = self.modulus
+        temp_self = [e % m for e in self.elements]
+        temp_o = [e % m for e in o.elements]
+        while temp_self and temp_o and temp_self[0] == temp_o[0] == 0:
+            temp_self.pop(0)
+            temp_o.pop(0)
+        if not temp_o:
+            raise ValueError("Cannot divide by zero or null sequence")
+        elif not temp_self:
+            return ModSeq(0, modulus=m)
+        length = _precision if _precision >= 0 else std_l
+        r = _inverse_mod(temp_o, length, m)
+        return ModSeq(_mul_ints(temp_self, r, length), modulus=m).trim()
+
+    def f(self, l: int=-1, seed=None) -> "ModSeq":
+        """
+        The recursive signature function, reduced modulo m
+
+        :param l: the length of the sequence
+        :param seed: an alternate beginning to the sequence
+        :return: the sequence F_d mod m
+        """
+        if l == -1:
+            l = std_l
+        m = self.modulus
+        r = [e % m for e in Seq(seed)] if seed else [1 % m]
+        d = self.elements
+        for n in range(len(r), l):
+            r.append(sum(map(operator.mul, d, reversed(r[max(n - len(d), 0):n]))) % m)
+        return ModSeq(r, modulus=m)
+
+    def f_nth(self, n: int, seed=None, modulus: int=None) -> int:
+        """
+        The n-th term of the signature function, reduced modulo m
+        """
+        return Seq.f_nth(self, n, seed=seed, modulus=modulus or self.modulus)
+
+    def i(self) -> "ModSeq":
+        """
+        The inverse signature function, reduced modulo m
+        Only works for sequences which begin with 1
+
+        :return: the sequence F^(-1)_d mod m
+        """
+        if self[0] != 1 % self.modulus:
+            raise ValueError("non-invertible: arg d must begin with 1")
+        if len(self) < 2:
+            return ModSeq(0, modulus=self.modulus)
+        inverse = _inverse_mod(self.elements, len(self), self.modulus)
+        return ModSeq([-e for e in inverse[1:]], modulus=self.modulus).trim()
+
+    def lift(self) -> Seq:
+        """
+        The residues as a plain Seq of integers
+        """
+        return Seq(self.elements)
+
+    def neg(self) -> "ModSeq":
+        return ModSeq([-k for k in self], modulus=self.modulus)
+
+    def trim(self, to_zero: bool=False) -> "ModSeq":
+        return ModSeq(Seq.trim(self, to_zero), modulus=self.modulus)
+
+
+def crt(*residues: ModSeq, signed: bool=False) -> Seq:
+    """
+    Reconstructs a sequence from its residues modulo pairwise coprime moduli
+    using the Chinese remainder theorem
+
+    :param residues: the same sequence reduced modulo each modulus
+    :param signed: whether to give values between -M/2 and M/2 rather than between 0 and M
+    :return: the sequence modulo the product M of the moduli
+    """
+    if not residues:
+        raise ValueError("crt requires at least one ModSeq")
+    length = max(len(r) for r in residues)
+    out = list(residues[0][:length])
+    m = residues[0].modulus
+    for r in residues[1:]:
+        inv = pow(m, -1, r.modulus)
+        out = [a + m * ((b - a) * inv % r.modulus) for a, b in zip(out, r[:length])]
+        m *= r.modulus
+    if signed:
+        out = [a - m if 2 * a > m else a for a in out]
+    return Seq(out)
+
+
 class Sig:
     """
     The Sig class implements the signature left near-ring's
@@ -682,14 +1471,27 @@ class Sig:
         elif isinstance(seq, list):
             self.seq = Seq(seq)
         elif isinstance(seq, Seq):
-            self.seq = Seq(list(seq.elements))
+            self.seq = Seq(seq)
         elif isinstance(seq, Sig):
-            self.seq = Seq(list(seq.seq.elements))
+            self.seq = Seq(seq.seq)
         else:
             raise ValueError(f"Unsupported type {type(seq)}")
 
+    @staticmethod
+    def _of(seq: Seq) -> "Sig":
+        """
+        Internal constructor which wraps a Seq without copying it
+        """
+        out = object.__new__(Sig)
+        out.seq = seq
+        return out
+
     @check_sig
     def __add__(self, o):
+        a = self.seq.elements
+        b = o.seq.elements
+        if _precision != 0 and _is_int_list(a) and _is_int_list(b) and any(a) and any(b):
+            return Sig._of(Seq._of(_sig_add_ints(a, b)))
         return Sig(self.seq + o.seq - x * self.seq * o.seq)
 
     @check_sig
@@ -700,16 +1502,20 @@ class Sig:
     def __floordiv__(self, b):
         """Computes the non-distributive left-inverse of multiplication"""
         l = max(len(self), len(b))
-        s = Seq(self[0] / b[0])
-        block = ([Seq(s**(x+1)) for x in range(l)])
+        # Dividing by 1 or -1 is multiplying by it, which keeps int signatures exact
+        unit = type(b[0]) is int and b[0] in (1, -1)
 
-        for x in range(1, l):
-            v = [(block[k][x - k]) * (b[k]) for k in range(1, x + 1)]
-            v = (self[x] - sum(v)) / b[0]
+        # Solve s * b = sum(b[k] x^k s^(k+1)) one term at a time. block[k] holds
+        # the terms of s^(k+1) which are still needed, so it shrinks as k grows.
+        out = []
+        block = [[] for _ in range(l)]
+        for n in range(l):
+            v = self[n] - sum(block[k][n - k] * b[k] for k in range(1, n + 1))
+            v = v * b[0] if unit else v / b[0]
+            out.append(v)
             block[0].append(v)
-            for k in range(1, l):
-                block[k].append(sum([block[0][len(block[0])-t-1] * block[k-1][t] for t in range(len(block[0]))]))
-        out = block[0].elements
+            for k in range(1, l - n):
+                block[k].append(sum(map(operator.mul, reversed(out), block[k - 1])))
         return Sig(out).trim()
 
     @check_sig
@@ -754,21 +1560,7 @@ class Sig:
 
     @check_sig
     def __mul__(self, o):
-        is_td = self.is_td()
-        if is_td:
-            base = self.base()
-            out = Seq(o[0])
-            g = Seq(Td.one(base))
-        else:
-            out = Seq(o[0])
-            g = Seq(1)
-        a = self.seq
-        aw = a * x
-        for k in range(1, len(o)):
-            g *= aw
-            out += g * o[k]
-        out *= a
-        return Sig(out)
+        return self.convolve(o)
 
     def __neg__(self):
         return Sig(-self.seq)
@@ -830,6 +1622,29 @@ class Sig:
         """
         return self.seq.base()
 
+    def convolve(self, o, l: int=-1) -> "Sig":
+        """
+        Signature convolution, computing only the first l terms
+
+        The product a * o is a * o(xa), so only the first l terms of o(xa) are needed.
+
+        :param o: the right operand
+        :param l: the number of terms to compute; defaults to the current precision, or the full product
+        :return: the signature convolution of self and o
+        """
+        if not isinstance(o, Sig):
+            o = Sig(o)
+        a = self.seq
+        if not len(a) or not len(o):
+            return Sig(Seq(o[0]) * a)
+        if l < 0:
+            l = _precision if _precision >= 0 else len(a) * len(o)
+        zero = Td.zero(self.base()) if self.is_td() else 0
+
+        with precision(l):
+            out = _compose(o.seq.elements, Seq._of([zero] + a.elements), l) * a
+        return Sig._of(out)
+
     def f(self, l: int=-1, seed=None) -> "Sig":
         """
         The recursive signature function
@@ -866,11 +1681,29 @@ class Sig:
     def iter_add(self, n: int) -> "Sig":
         """
         Perform iterated signature addition of the signature
+
+        Signature addition multiplies the reciprocals of the signature functions,
+        1 - x(a + b) = (1 - xa)(1 - xb), so n copies of d add up to (1 - (1 - xd)^n) / x
+        and the power is found by repeated squaring. Negative n uses the signature
+        function F_d = 1 / (1 - xd) in place of 1 - xd, truncated to the standard length.
+
         :param n: the number of times to add the signature
         """
         out = Sig(Td.zero(self.base()) if self.is_td() else 0)
-        if n == 0:
+        if n == 0 or not len(self):
             return out
+        elif n > 0 or not self.is_td():
+            one = Td.one(self.base()) if self.is_td() else 1
+            base = Seq([one] + [-v for v in self.seq])
+            if n > 0:
+                l = _precision if _precision >= 0 else n * len(self)
+            else:
+                l = _precision if _precision >= 0 else std_l
+                with precision(l + 1):
+                    base = Seq(one) / base
+            with precision(l + 1):
+                p = base ** abs(n)
+            return Sig._of((Seq(one) - p)[1:l + 1])
         else:
             for k in range(n if n > 0 else -n):
                 if n < 0:
@@ -894,16 +1727,20 @@ class Sig:
         :param l: The length of the output
         :return: the multiplicative inverse of the signature
         """
+        if l == -1:
+            l = std_l
+
+        a = self.seq.elements
+        if a and a[0] in (1, -1) and _is_int_list(a):
+            return Sig._of(Seq._of(self.__newton_left_divide(Seq(1), l)))
+
         # This is the fast one, see below comment
         inverse = Seq(1 / self[0])
         length_of_previous_inverse = 0
         length_of_current_inverse = -1
 
-        if l == -1:
-            l = std_l
-
         while len(inverse) < l and length_of_previous_inverse != length_of_current_inverse:
-            product = (Sig(inverse) * self)[:l]
+            product = Sig(inverse).convolve(self, l)[:l]
             x_pow = product.first_nonzero()
 
             inverse -= ((x ** x_pow) * product[x_pow]) / self[0]
@@ -912,6 +1749,28 @@ class Sig:
 
         return Sig(inverse)[:length_of_current_inverse]
 
+    def __newton_left_divide(self, a: Seq, l: int) -> list:
+        """
+        The first l terms of the signature s with s * self = a,
+        for integer signatures where self begins with 1 or -1
+
+        With h(d) = xd, signature convolution satisfies h(s * b) = h(b)(h(s)),
+        so Newton's method on h(b)(g) = h(a) doubles the number of correct terms
+        of g = h(s) per step. The leading unit keeps every step in the integers.
+        """
+        b = self.seq.elements
+        h = [0] + b
+        dh = [(k + 1) * v for k, v in enumerate(b)]
+        target = Seq._of([0] + a.elements)
+        g = Seq._of([0, a[0] * b[0]])
+        n = 2
+        while n < l + 1:
+            n = min(2 * n, l + 1)
+            with precision(n):
+                residual = _compose(h, g, n) - target
+                g = g - residual * (Seq(1) / _compose(dh, g, n))
+        return (g.elements[1:l + 1] + [0] * l)[:l]
+
     def neg(self) -> "Sig":
         """
         Converts the given sequence to its additive inverse
@@ -928,12 +1787,238 @@ class Sig:
         return Sig(self.seq.trim())
 
 
+def _add_columns(a: list, b: list) -> list:
+    """
+    Sum of two batches of series stored as lists of columns
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    return [list(map(operator.add, p, q)) for p, q in zip(a, b)] + a[len(b):]
+
+
+def _mul_columns(a: list, b: list, l: int=-1) -> list:
+    """
+    Convolution of two batches of series stored as lists of columns
+
+    Column k holds the coefficient of x^k of every series in the batch,
+    so every step works on the whole batch with one map call.
+
+    :param l: the number of coefficients to compute, or -1 for all of them
+    """
+    length = len(a) + len(b) - 1
+    if 0 <= l < length:
+        length = l
+    out = []
+    for k in range(length):
+        acc = None
+        for i in range(max(0, k - len(b) + 1), min(k, len(a) - 1) + 1):
+            term = map(operator.mul, a[i], b[k - i])
+            acc = list(term) if acc is None else list(map(operator.add, acc, term))
+        out.append(acc)
+    return out
+
+
+class SigBatch:
+    """
+    A batch of signatures, padded to a common length
+
+    Signature addition, convolution, f and i apply to every signature of the batch
+    and return a new batch. A single Sig operand is applied to each signature.
+    Batches of integer signatures are processed a coefficient at a time across the
+    whole batch, rather than one signature at a time.
+    """
+
+    @staticmethod
+    def random(n: int, min: int=1, max: int=7, l: int=5) -> "SigBatch":
+        """
+        A batch of random signatures
+
+        :param n: the number of signatures
+        :param min: the smallest possible term
+        :param max: the largest possible term
+        :param l: the length of each signature
+        """
+        return SigBatch([[random.randint(min, max) for _ in range(l)] for _ in range(n)])
+
+    @staticmethod
+    def signature_dot_product(g: list, S: list) -> "SigBatch":
+        """
+        The batched form of signature_dot_product
+
+        Each of g and S is a list whose entries are either batches of the same size or single signatures.
+        """
+        n = max([len(o) for o in list(g) + list(S) if isinstance(o, SigBatch)] + [1])
+        out = None
+        for k, g_k in enumerate(g):
+            term = g_k if isinstance(g_k, SigBatch) else SigBatch(SigBatch.__rows(g_k, n))
+            if k < len(S):
+                term = term.convolve(S[k])
+            out = term if out is None else out + term
+        return out if out is not None else SigBatch([[0]] * n)
+
+    @staticmethod
+    def __rows(o, n: int) -> list:
+        """
+        The rows of an operand, repeating a single signature n times
+        """
+        if isinstance(o, SigBatch):
+            if len(o) != n:
+                raise ValueError(f"Batch size mismatch: {len(o)} and {n}")
+            return o.rows
+        return [Seq(o).elements] * n
+
+    @staticmethod
+    def _of(rows: list) -> "SigBatch":
+        """
+        Internal constructor which pads the given rows without validating them
+
+        The unpadded length of every row is kept, since the inverse signature
+        function of a row depends on where it ends.
+        """
+        out = object.__new__(SigBatch)
+        width = max([len(r) for r in rows] + [0])
+        out.rows = [r if len(r) == width else r + [Td.zero(r[0].base) if r and isinstance(r[0], Td) else 0] * (width - len(r)) for r in rows]
+        out.lengths = [len(r) for r in rows]
+        return out
+
+    @staticmethod
+    def _of_columns(columns: list, n: int) -> "SigBatch":
+        out = object.__new__(SigBatch)
+        out.rows = [list(r) for r in zip(*columns)] if columns else [[] for _ in range(n)]
+        out.lengths = [len(columns)] * n
+        return out
+
+    def __init__(self, *sigs):
+        if len(sigs) == 1 and isinstance(sigs[0], (list, SigBatch)):
+            sigs = sigs[0]
+        rows = [Seq(s).elements for s in sigs]
+        batch = SigBatch._of(rows)
+        self.rows, self.lengths = batch.rows, batch.lengths
+
+    def __add__(self, o):
+        rows = SigBatch.__rows(o, len(self))
+        if _precision != 0 and self.__is_int() and all(_is_int_list(r) for r in rows):
+            a, b = self.__columns(self.rows), self.__columns(rows)
+            if _precision > 0:
+                a, b = a[:_precision], b[:_precision]
+            # a + b - xab
+            product = _mul_columns(a, b, _precision - 1 if _precision > 0 else -1)
+            out = _add_columns(a, b)
+            zeros = [0] * len(self)
+            out.extend([zeros] * (len(product) + 1 - len(out)))
+            out[1:len(product) + 1] = [list(map(operator.sub, p, q)) for p, q in zip(out[1:], product)]
+            return SigBatch._of_columns(out, len(self))
+        return SigBatch._of([(Sig._of(Seq._of(a)) + Sig._of(Seq._of(b))).seq.elements for a, b in zip(self.rows, rows)])
+
+    def __eq__(self, o):
+        if not isinstance(o, SigBatch) or len(self) != len(o):
+            return False
+        return all(a == b for a, b in zip(self, o))
+
+    def __getitem__(self, i):
+        if isinstance(i, int):
+            return Sig(self.rows[i])
+        elif isinstance(i, slice):
+            out = SigBatch._of(self.rows[i])
+            out.lengths = self.lengths[i]
+            return out
+
+    def __iter__(self):
+        return (Sig(r) for r in self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __mul__(self, o):
+        return self.convolve(o)
+
+    def __str__(self):
+        return "\n".join(str(s) for s in self)
+
+    @staticmethod
+    def __columns(rows: list) -> list:
+        return [list(c) for c in zip(*rows)]
+
+    def __is_int(self) -> bool:
+        return all(_is_int_list(r) for r in self.rows)
+
+    def convolve(self, o, l: int=-1) -> "SigBatch":
+        """
+        Signature convolution of every signature with the matching one of o
+
+        :param o: a batch of the same size, or a single signature
+        :param l: the number of terms to compute; defaults to the current precision, or the full product
+        """
+        rows = SigBatch.__rows(o, len(self))
+        if not self.__is_int() or not all(_is_int_list(r) for r in rows) or not self.width() or not rows[0]:
+            return SigBatch._of([Sig._of(Seq._of(a)).convolve(Sig._of(Seq._of(b)), l).seq.elements
+                                 for a, b in zip(self.rows, rows)])
+        if l < 0:
+            l = _precision if _precision >= 0 else self.width() * len(rows[0])
+        a, b = self.__columns(self.rows), self.__columns(rows)
+        # a * b = a * b(xa), by Horner's rule
+        xa = [[0] * len(self)] + a
+        out = b[-1:]
+        for k in range(len(b) - 2, -1, -1):
+            out = _mul_columns(out, xa, l)
+            out[0] = list(map(operator.add, out[0], b[k]))
+        return SigBatch._of_columns(_mul_columns(out, a, l), len(self))
+
+    def f(self, l: int=-1) -> "SigBatch":
+        """
+        The signature function of every signature
+
+        :param l: the length of each sequence
+        """
+        if l == -1:
+            l = std_l
+        if not self.__is_int():
+            return SigBatch._of([Seq._of(d).f(l).elements for d in self.rows])
+        d = self.__columns(self.rows)
+        out = [[1] * len(self)]
+        for n in range(1, l):
+            acc = [0] * len(self)
+            for k in range(min(n, len(d))):
+                acc = list(map(operator.add, acc, map(operator.mul, d[k], out[n - 1 - k])))
+            out.append(acc)
+        return SigBatch._of_columns(out[:l], len(self))
+
+    def i(self) -> "SigBatch":
+        """
+        The inverse signature function of every sequence
+        """
+        if not self.__is_int():
+            return SigBatch._of([Seq._of(d[:n]).i().elements for d, n in zip(self.rows, self.lengths)])
+        f = self.__columns(self.rows)
+        if f and any(v != 1 for v in f[0]):
+            raise ValueError("non-invertible: arg d must begin with 1")
+        # F_n = sum(d_k F_(n-1-k)), solved for d_(n-1)
+        out = []
+        for n in range(1, len(f)):
+            acc = f[n]
+            for k in range(n - 1):
+                acc = list(map(operator.sub, acc, map(operator.mul, out[k], f[n - 1 - k])))
+            out.append(acc)
+        # Each row only determines as many terms as its own length allows
+        rows = SigBatch._of_columns(out, len(self)).rows
+        return SigBatch._of([Seq._of(r[:max(n - 1, 0)]).trim().elements for r, n in zip(rows, self.lengths)])
+
+    def width(self) -> int:
+        """
+        The common length of the signatures
+        """
+        return len(self.rows[0]) if self.rows else 0
+
+
 class Matrix:
     """
     The Matrix class allows for the construction of various
     matrices in order to experiment with antidiagonal summation
     """
 
+    # Columns and other values derived from the rows, see __cached
+    _cache = None
+
     @staticmethod
     def blank(l: int=-1, w: int=-1, base: int=-1) -> "Matrix":
         """
@@ -950,7 +2035,7 @@ class Matrix:
             zero = Td.zero(base)
         else:
             zero = 0
-        return Matrix([Seq([zero for k in range(w)]) for n in range(l)])
+        return Matrix._of([Seq._of([zero] * w) for n in range(l)])
 
     @staticmethod
     def g_matrix(s: "Matrix", g: list[Seq], l: int=-1, w: int=-1) -> "Matrix":
@@ -969,16 +2054,27 @@ class Matrix:
         if isinstance(g, (Seq, Sig)):
             g = [g]
 
-        g_signature = sum([g_p.sig() for g_p in g])
+        # Only the first l - 1 terms of the combined signature are ever read
+        with precision(l):
+            g_signature = sum([g_p.sig() for g_p in g])
+        sigma = [g_signature[k] for k in range(l - 1)]
+        rows = [s[n].elements[:w] + [0] * (w - len(s[n])) for n in range(l)]
 
-        output = Matrix.blank(l=l, w=w)
+        # Each column is a column of s divided by 1 - x*g_signature, so the
+        # reciprocal is found once and shared by every column
+        if _is_int_list(sigma) and all(_is_int_list(row) for row in rows):
+            r = _inverse_ints([1] + [-e for e in sigma], l)
+            columns = [_mul_ints(list(c), r, l) if any(c) else [] for c in zip(*rows)]
+            return Matrix._of([Seq._of([c[n] if n < len(c) else 0 for c in columns]) for n in range(l)])
+
+        output = []
         for n in range(l):
-            for y in range(w):
-                output[n][y] = s[n][y]
-                for k in range(1, n+1):
-                    output[n][y] += output[n-k][y] * g_signature[k-1]
+            row = rows[n]
+            for k in range(1, n+1):
+                row = list(map(operator.add, row, map(operator.mul, output[n-k], itertools.repeat(sigma[k-1]))))
+            output.append(row)
 
-        return output
+        return Matrix._of([Seq._of(row) for row in output])
 
     @staticmethod
     def identity(l: int=-1, base: int=-1) -> "Matrix":
@@ -1006,24 +2102,48 @@ class Matrix:
         :param taper: whether or not to extend the triangle in a way amenable to antidiagonal summation
         :return: the power triangle of d
         """
-        d = Seq(d)
+        d = ModSeq(d, modulus=d.modulus) if isinstance(d, ModSeq) else Seq(d)
         if l == -1:
             l = std_l
         if w == -1:
             w = l * (len(d) - 1) + 1
-        if d.is_td():
-            out = [Seq(Td.one(d.base()))]
-        else:
-            out = [Seq(1)]
-        for k in range(1, l):
-            out.append((out[-1] * d)[:w])
+        out = list(Matrix.power_generator(d, max(l, 1), w))
         # Tapering maximizes efficiency of computing f()
         if taper:
             t = len(out[-1].trim()) - 1
             for k in range(t):
-                out.append((out[-1] * d)[:t - k])
+                with precision(t - k):
+                    out.append((out[-1] * d)[:t - k])
         return Matrix(out)
 
+    @staticmethod
+    def power_generator(d: Seq, l: int=-1, w: int=-1):
+        """
+        Yields the rows of the power triangle d^n_y one at a time
+
+        Each row is the previous row times d, computed only up to the width,
+        so a row costs O(w * len(d)) and only one row is held at a time.
+
+        :param d: the sequence base of the triangle
+        :param l: the number of rows, or None to continue indefinitely
+        :param w: the width of each row; rows are not truncated if l is None and w is not given
+        """
+        d = ModSeq(d, modulus=d.modulus) if isinstance(d, ModSeq) else Seq(d)
+        if l == -1:
+            l = std_l
+        if w == -1 and l is not None:
+            w = l * (len(d) - 1) + 1
+        row = d ** 0
+        n = 0
+        while l is None or n < l:
+            yield row
+            n += 1
+            if w == -1:
+                row = row * d
+            else:
+                with precision(w):
+                    row = (row * d)[:w]
+
     @staticmethod
     def sen(d: Seq, l: int=-1, w: int=-1) -> "Matrix":
         """
@@ -1078,11 +2198,15 @@ class Matrix:
             else:
                 return Matrix(Seq(1))
 
-        if s.is_td():
-            b = Matrix.blank(l, base=s.base())
-        else:
-            b = Matrix.blank(l)
-
+        if _is_int_list(s.elements) and _is_int_list(d.elements) and d.elements:
+            # Every entry of row n past the first is a correlation of row n-1 with d,
+            # so the whole row is a single slice of the product (row n-1) * d
+            g = s.elements[:l] + [0] * (l - len(s))
+            rows = [[1], [g[1], s[0] * d[0]]]
+            for n in range(2, l):
+                row = _mul_ints(rows[-1], d.elements, len(d) + n - 1)[len(d) - 1:]
+                rows.append([g[n]] + row + [0] * (n - len(row)))
+            return Matrix._of([Seq._of(row) for row in rows])
 
         if s.is_td():
             b = [Seq(Td.one(s.base())), Td([1, 1], base=s.base())]
@@ -1097,6 +2221,31 @@ class Matrix:
 
         return Matrix(b)
 
+    @staticmethod
+    def riordan_columns(s: Seq, d: Seq, l: int=-1):
+        """
+        Yields the columns of the Riordan array one at a time
+
+        The columns come from the generating-function pair (g, f) with f = xA(f),
+        so column k costs one truncated product with f and the rows are never built.
+
+        :param s: the sequence which fills the first column
+        :param d: the recurrence relation for each row
+        :param l: the length of each column
+        """
+        if l == -1:
+            l = std_l
+
+        if not (_is_int_list(s.elements) and _is_int_list(d.elements) and d.elements) or l < 2:
+            m = Matrix.riordan(s, d, l)
+            for k in range(l):
+                yield m.column(k)
+            return
+
+        yield Seq._of([1] + s.elements[1:l] + [0] * (l - max(len(s), 1)))
+        for k, column in enumerate(_riordan_columns_ints(s.elements, d.elements, l), 1):
+            yield Seq._of([0] * k + column)
+
     def __init__(self, *rows):
         if len(rows) == 1:
             rows = rows[0]
@@ -1112,7 +2261,9 @@ class Matrix:
             self.rows.append(Seq(rows))
         elif isinstance(rows, list):
             for e in rows:
-                if isinstance(e, (Seq, Sig)):
+                if isinstance(e, ModSeq):
+                    self.rows.append(ModSeq(e, modulus=e.modulus))
+                elif isinstance(e, (Seq, Sig)):
                     self.rows.append(Seq(e))
                 elif isinstance(e, list):
                     self.rows.append(Seq(e))
@@ -1125,10 +2276,24 @@ class Matrix:
         else:
             raise ValueError(f"Unsupported type {type(rows)}")
 
+    @staticmethod
+    def _of(rows: list) -> "Matrix":
+        """
+        Internal constructor which adopts a list of Seq rows without copying them
+        """
+        out = object.__new__(Matrix)
+        out.rows = rows
+        return out
+
     def __add__(self, other: "Matrix"):
         length = max(len(self), len(other))
         width = max(self.width(), other.width())
-        out = Matrix([Seq([0 for k in range(width)]) for x in range(width)])
+        # Every row of both matrices is kept, and the sum is at least square
+        if self.__is_int() and other.__is_int():
+            rows = [_add_ints(self[x].elements, other[x].elements) for x in range(length)]
+            return self.__reduce(other, Matrix._of([Seq._of(r + [0] * (width - len(r))) for r in rows] +
+                                                   [Seq._of([0] * width) for x in range(width - len(rows))]))
+        out = Matrix([Seq([0 for k in range(width)]) for x in range(max(length, width))])
         for x in range(length):
             for y in range(width):
                 out[x][y] = self[x][y] + other[x][y]
@@ -1161,7 +2326,9 @@ class Matrix:
             if step < 0:
                 start, stop = stop - 1, start - 1
 
-            return Matrix([self[k] for k in range(start, stop, step)])
+            rows = [self[k] for k in range(start, stop, step)]
+            return Matrix._of([ModSeq._of(list(row.elements), row.modulus) if isinstance(row, ModSeq) else Seq._of(list(row.elements))
+                               for row in rows])
 
     def __iter__(self):
         return iter(self.rows)
@@ -1186,23 +2353,74 @@ class Matrix:
         elif isinstance(other, Sig):
             return Matrix([Seq(Sig(g) * other) for g in self])
         elif isinstance(other, Matrix):
-            width = max(self.width(), other.width())
-            length = max(len(self), len(other))
-            out = Matrix.blank(length, width, self[0].base())
-            other_t = other.transpose()
-            for n in range(length):
-                for y in range(width):
-                    out[n][y] = self[n].dot_product(other_t[y])
-            return out.trim()
+            return self.__product(other, matrix_workers, parallel_threshold)
+        elif isinstance(other, SparseMatrix):
+            return (SparseMatrix(self) * other).dense()
         else:
             raise ValueError(f"Incompatible type {type(other)}; must be int, float, Seq, or Matrix")
 
+    def __product(self, other: "Matrix", workers: int, threshold: int, pool=None) -> "Matrix":
+        """
+        The matrix product, computing int products with at least threshold cells across workers processes
+
+        :param pool: a process pool to reuse; one is started for this product if needed and not given
+        """
+        width = max(self.width(), other.width())
+        length = max(len(self), len(other))
+        if self.__is_int() and other.__is_int():
+            # Each column of other is kept without its leading and trailing zeroes,
+            # so that every cell is a single C-level dot product over the overlap
+            columns = other.__cached("bands", other.__bands)
+            rows = [_trim_ints(self.rows[n].elements) if n < len(self) else [] for n in range(length)]
+            if workers > 1 and length * width >= threshold:
+                if pool is None:
+                    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                        out = Matrix.__block_products(rows, columns, width, workers, pool)
+                else:
+                    out = Matrix.__block_products(rows, columns, width, workers, pool)
+            else:
+                out = _band_products(rows, columns, width)
+            return self.__reduce(other, Matrix._of([Seq._of(row) for row in out])).trim()
+        out = Matrix.blank(length, width, self[0].base())
+        other_t = other.__cached("transpose", other.transpose)
+        for n in range(length):
+            for y in range(width):
+                out[n][y] = self[n].dot_product(other_t[y])
+        return out.trim()
+
+    @staticmethod
+    def __block_products(rows: list, bands: list, width: int, workers: int, pool) -> list:
+        """
+        Computes blocks of rows of an int product in the processes of pool
+
+        The left-hand rows are split into one block per worker and sent as plain int
+        lists together with the bands of the right-hand matrix, so that no Seq objects
+        are serialized and the bands are sent about once per worker.
+        """
+        size = max(1, -(-len(rows) // workers))
+        blocks = [rows[n:n + size] for n in range(0, len(rows), size)]
+        results = pool.map(_band_products, blocks, itertools.repeat(bands), itertools.repeat(width))
+        return [row for block in results for row in block]
+
     def __pow__(self, power: int, modulo=None):
         if power == 0:
             return Matrix.identity(len(self))
-        out = self[:]
-        for k in range(1, power):
-            out = out * self
+        elif power < 2:
+            return self[:]
+
+        # Square-and-multiply. Products only read the columns of the left operand
+        # up to the length of the right one, and that truncation is associative.
+        # Every product shares one process pool when products run in parallel.
+        workers, threshold = matrix_workers, parallel_threshold
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as pool:
+            a = self
+            out = None
+            while power:
+                if power & 1:
+                    out = a if out is None else out.__product(a, workers, threshold, pool)
+                power >>= 1
+                if power:
+                    a = a.__product(a, workers, threshold, pool)
         return out
 
     def __rmul__(self, other):
@@ -1215,6 +2433,7 @@ class Matrix:
         return out
 
     def __setitem__(self, key: int, value):
+        self._cache = None
         if isinstance(value, int):
             self.rows[key] = Seq(value)
         else:
@@ -1238,6 +2457,7 @@ class Matrix:
 
         :param line: the line to be added to the block
         """
+        self._cache = None
         self.rows.append(line)
 
     def base_sequence(self, b: int) -> Seq:
@@ -1245,12 +2465,17 @@ class Matrix:
         Interprets each row as a base-b number, and returns a sequence
         where a(n) = M(n)_b
 
-        This only works for non-Td matrices at present. I'll add it eventually.
         :param b: the base to interpret the matrix in
         :return: the matrix's base sequence
         """
-        if self.rows and self.rows[0].is_td():
-            raise TypeError(f"Cannot construct base sequence from Td matrix at present.")
+        if self.rows and self.rows[0].is_td() and b > 1:
+            output = []
+            for row in self:
+                value = Td.zero(row.base())
+                for d in row.trim():
+                    value = value * b + d
+                output.append(value.abs())
+            return Seq(output)
         if b == 0:
             return Seq([row.trim()[-1] for row in self])
         elif b == 1:
@@ -1258,6 +2483,9 @@ class Matrix:
             for row in self:
                 output.append(sum(row))
             return output
+        elif self.__is_int():
+            # The magnitude is kept, as in the conversion through an unsigned Td, and as for Td rows above
+            return Seq._of([abs(_horner_ints(_trim_ints(row.elements), b)) for row in self.rows])
         else:
             output = Seq()
             for row in self:
@@ -1265,10 +2493,13 @@ class Matrix:
             return output
 
     def column(self, c: int) -> Seq:
-        return Seq([self[n][c] for n in range(len(self))])
+        if c >= 0 and self.__is_int():
+            columns = self.__columns()
+            return Seq._of(list(columns[c]) if c < len(columns) else [0] * len(self))
+        return Seq._of([row[c] for row in self.rows])
 
     def column_slice(self, start: int, stop: int, step: int) -> "Matrix":
-        return Matrix([self[n][start:stop:step] for n in range(len(self))])
+        return Matrix._of([row[start:stop:step] for row in self.rows])
 
     def diagonalise(self, direction: bool=True) -> "Matrix":
         """
@@ -1295,6 +2526,18 @@ class Matrix:
         :param g: the signature convolution coefficient
         :return: the sequence result of antidiagonal summation
         """
+        if a > 0 and self.__is_int() and _is_int_list(g.elements):
+            # Row r contributes to every a-th term from r onwards, so each row is one strided slice
+            l = len(self)
+            g_f = _signature_function_ints(tuple(g.elements), l)
+            out = [0] * l
+            for r, row in enumerate(self.rows):
+                count = min(len(row), (l - r + a - 1) // a)
+                if count > 0 and g_f[r]:
+                    stop = r + a * count
+                    out[r:stop:a] = map(operator.add, out[r:stop:a], map(operator.mul, row.elements[:count], itertools.repeat(g_f[r])))
+            return Seq._of(out)
+
         g_f = g.f(len(self))
         out = Seq([0 for k in range(len(self))])
         for n in range(len(self)):
@@ -1317,6 +2560,16 @@ class Matrix:
         """
         return self.f(a, g).i()
 
+    def parallel_product(self, other: "Matrix", workers: int=-1) -> "Matrix":
+        """
+        The product self * other, computing int rows in blocks across processes whatever its size
+
+        :param other: the right-hand matrix
+        :param workers: the number of processes; defaults to the number of CPUs
+        :return: the same matrix as self * other
+        """
+        return self.__product(other, workers if workers > 0 else os.cpu_count() or 1, 0)
+
     def reverse(self) -> "Matrix":
         return Matrix([self[n].trim()[::-1] for n in range(len(self))])
 
@@ -1325,6 +2578,9 @@ class Matrix:
 
     def transpose(self) -> "Matrix":
         l = max([len(self)] + [len(row) for row in self])
+        if self.__is_int():
+            columns = self.__columns()
+            return Matrix._of([Seq._of(list(c)) for c in columns] + [Seq._of([0] * len(self)) for n in range(l - len(columns))])
         return Matrix([Seq([self[k][n] for k in range(len(self))]) for n in range(l)])
 
     def transposition_product(self, other: "Matrix") -> "Matrix":
@@ -1335,25 +2591,66 @@ class Matrix:
         Remove trailing zero sequences from the matrix
         :return: the trimmed matrix
         """
-        out = self
-        while len(out) > 0:
-            if len(out[-1].trim(to_zero=True)) == 0:
-                out = out[:-1]
-            else:
-                return out
-        return out
+        n = len(self)
+        while n > 0 and len(self.rows[n - 1].trim(to_zero=True)) == 0:
+            n -= 1
+        return self if n == len(self) else self[:n]
 
     def neg(self) -> "Matrix":
         out = [-v for v in self]
         return Matrix(out)
 
     def truncate(self, l: int) -> "Matrix":
-        out = Matrix([s[:l] for s in self.rows[:l]])
+        out = Matrix._of([s[:l] for s in self.rows[:l]])
         return out
 
     def width(self) -> int:
         return max([len(k) for k in self.rows])
 
+    def __bands(self) -> list:
+        """
+        The columns of an integer matrix as pairs of their first nonzero row and the entries from there
+        """
+        bands = []
+        for c in self.__columns():
+            start = next((k for k, v in enumerate(c) if v), len(c))
+            bands.append((start, _trim_ints(c)[start:]))
+        return bands
+
+    def __cached(self, name: str, build):
+        """
+        A value derived from the rows, built once and shared until the rows change
+
+        The cache is dropped when a row is replaced or appended, or when any row is
+        changed in place, which is detected by the version every Seq mutation increments.
+        The returned value must not be modified.
+        """
+        versions = [row._version for row in self.rows]
+        cache = self._cache
+        if cache is None or cache[1] != versions or not all(map(operator.is_, cache[0], self.rows)):
+            self._cache = cache = (list(self.rows), versions, {})
+        if name not in cache[2]:
+            cache[2][name] = build()
+        return cache[2][name]
+
+    def __columns(self) -> list:
+        """
+        The columns of an integer matrix, with short rows padded by zeroes
+        """
+        return self.__cached("columns", lambda: [list(c) for c in itertools.zip_longest(*[row.elements for row in self.rows], fillvalue=0)])
+
+    def __reduce(self, other: "Matrix", out: "Matrix") -> "Matrix":
+        """
+        Reduces an int result by the modulus of the ModSeq rows of either operand, keeping its rows ModSeq
+        """
+        m = next((row.modulus for row in self.rows + other.rows if isinstance(row, ModSeq)), None)
+        if m is None:
+            return out
+        return Matrix._of([ModSeq(row, modulus=m) for row in out.rows])
+
+    def __is_int(self) -> bool:
+        return self.__cached("is_int", lambda: all(_is_int_list(row.elements) for row in self.rows))
+
 
 def num_dims(d) -> int:
     """
@@ -1374,6 +2671,226 @@ def num_dims(d) -> int:
     return output
 
 
+class SparseMatrix:
+    """
+    A matrix which stores only the nonzero entries of each row
+
+    Every row is a pair of lists, the columns of its nonzero entries and their
+    values, together with the length the row would have as a Seq. Indexing a row
+    returns the dense Seq, so entries are read as in Matrix. Power triangles with
+    a short or aerated d, identities and their products are mostly zeros, and
+    their memory then scales with the number of nonzero entries.
+    """
+
+    @staticmethod
+    def identity(l: int=-1) -> "SparseMatrix":
+        """
+        The sparse identity matrix
+
+        :param l: the length of the matrix
+        """
+        if l == -1:
+            l = std_l
+        return SparseMatrix._of([([n], [1]) for n in range(l)], [l] * l)
+
+    @staticmethod
+    def power(d: Seq, l: int=-1, w: int=-1) -> "SparseMatrix":
+        """
+        The sparse power triangle d^n_y, as in Matrix.power
+
+        Each row is the previous row times d, computed over nonzero entries only.
+
+        :param d: the sequence base of the triangle
+        :param l: the number of rows
+        :param w: the width of each row
+        """
+        if l == -1:
+            l = std_l
+        if w == -1:
+            w = l * (len(d) - 1) + 1
+        d = [(k, v) for k, v in enumerate(d.elements) if v != 0]
+        rows, widths = [([0], [1])], [1]
+        for n in range(1, l):
+            row = {}
+            for c, v in zip(*rows[-1]):
+                for k, u in d:
+                    if c + k < w:
+                        row[c + k] = row.get(c + k, 0) + v * u
+            indices = sorted(y for y in row if row[y] != 0)
+            rows.append((indices, [row[y] for y in indices]))
+            widths.append(w)
+        return SparseMatrix._of(rows, widths)
+
+    def __init__(self, m: Matrix):
+        self.rows = []
+        self.widths = []
+        for row in m:
+            indices = [y for y, v in enumerate(row.elements) if v != 0]
+            self.rows.append((indices, [row.elements[y] for y in indices]))
+            self.widths.append(len(row))
+
+    @staticmethod
+    def _of(rows: list, widths: list) -> "SparseMatrix":
+        """
+        Wraps lists of (columns, values) pairs and row lengths without copying or checking them
+        """
+        out = object.__new__(SparseMatrix)
+        out.rows = rows
+        out.widths = widths
+        return out
+
+    def __eq__(self, other):
+        if isinstance(other, SparseMatrix):
+            return self.dense() == other.dense()
+        return self.dense() == other
+
+    def __getitem__(self, i: [int, slice]):
+        if isinstance(i, int):
+            if i < 0:
+                i += len(self)
+            if not 0 <= i < len(self):
+                return Seq(0)
+            out = [0] * self.widths[i]
+            for y, v in zip(*self.rows[i]):
+                out[y] = v
+            return Seq._of(out)
+        elif isinstance(i, slice):
+            r = range(*i.indices(len(self)))
+            return SparseMatrix._of([self.rows[n] for n in r], [self.widths[n] for n in r])
+
+    def __iter__(self):
+        for n in range(len(self)):
+            yield self[n]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __mul__(self, other):
+        """
+        The product with a scalar, or with a Matrix or SparseMatrix as in Matrix.__mul__
+        """
+        if isinstance(other, (int, float)):
+            if other == 0:
+                return SparseMatrix._of([([], []) for _ in self.rows], list(self.widths))
+            return SparseMatrix._of([(list(c), [v * other for v in r]) for c, r in self.rows], list(self.widths))
+        elif isinstance(other, Matrix):
+            other = SparseMatrix(other)
+        elif not isinstance(other, SparseMatrix):
+            raise ValueError(f"Incompatible type {type(other)}; must be int, float, Matrix or SparseMatrix")
+
+        width = max(self.width(), other.width())
+        length = max(len(self), len(other))
+        rows = []
+        for n in range(length):
+            row = {}
+            if n < len(self):
+                for k, v in zip(*self.rows[n]):
+                    if k < len(other):
+                        for y, u in zip(*other.rows[k]):
+                            row[y] = row.get(y, 0) + v * u
+            indices = sorted(y for y in row if row[y] != 0)
+            rows.append((indices, [row[y] for y in indices]))
+        while rows and not rows[-1][0]:
+            rows.pop()
+        return SparseMatrix._of(rows, [width] * len(rows))
+
+    def __pow__(self, power: int, modulo=None):
+        if power == 0:
+            return SparseMatrix.identity(len(self))
+        elif power < 2:
+            return self[:]
+        a = self
+        out = None
+        while power:
+            if power & 1:
+                out = a if out is None else out * a
+            power >>= 1
+            if power:
+                a = a * a
+        return out
+
+    def __str__(self):
+        return str(self.dense())
+
+    def dense(self) -> Matrix:
+        """
+        The same matrix with every entry stored
+        """
+        return Matrix._of(list(self))
+
+    def diagonalise(self, direction: bool=True) -> "SparseMatrix":
+        """
+        Construct a matrix using the diagonals of the given matrix, as in Matrix.diagonalise
+
+        :param direction: whether to go from top-right to bottom-left (True) or the other way
+        """
+        l = len(self)
+        rows = [{} for _ in range(l)]
+        for r, (indices, values) in enumerate(self.rows):
+            for c, v in zip(indices, values):
+                if r + c < l:
+                    rows[r + c][c if direction else r] = v
+        rows = [(sorted(row), [row[y] for y in sorted(row)]) for row in rows]
+        return SparseMatrix._of(rows, [l] * l)
+
+    def f(self, a: int=1, g: Seq=Seq(1)) -> Seq:
+        """
+        Aerated signature convolution over the nonzero entries, as in Matrix.f
+
+        :param a: the aeration coefficient
+        :param g: the signature convolution coefficient
+        :return: the sequence result of antidiagonal summation
+        """
+        l = len(self)
+        g_f = g.f(l)
+        out = [0] * l
+        for r, (indices, values) in enumerate(self.rows):
+            for k, v in zip(indices, values):
+                n = r + a * k
+                if n >= l:
+                    break
+                elif k <= n:
+                    out[n] += v * g_f[r]
+        return Seq._of(out)
+
+    def sieve(self, sieve_factor: int) -> "SparseMatrix":
+        """
+        Keep every sieve_factor-th column, as in Matrix.sieve
+        """
+        rows = []
+        for indices, values in self.rows:
+            kept = [(y // sieve_factor, v) for y, v in zip(indices, values) if y % sieve_factor == 0]
+            rows.append(([y for y, v in kept], [v for y, v in kept]))
+        return SparseMatrix._of(rows, [-(-w // sieve_factor) for w in self.widths])
+
+    def transpose(self) -> "SparseMatrix":
+        l = max([len(self)] + self.widths)
+        rows = [([], []) for _ in range(l)]
+        for r, (indices, values) in enumerate(self.rows):
+            for c, v in zip(indices, values):
+                rows[c][0].append(r)
+                rows[c][1].append(v)
+        return SparseMatrix._of(rows, [len(self)] * l)
+
+    def trim(self) -> "SparseMatrix":
+        """
+        Remove trailing zero rows from the matrix
+        """
+        n = len(self)
+        while n > 0 and not self.rows[n - 1][0]:
+            n -= 1
+        return self if n == len(self) else self[:n]
+
+    def width(self) -> int:
+        return max(self.widths, default=0)
+
+    def nnz(self) -> int:
+        """
+        The number of stored entries
+        """
+        return sum(len(indices) for indices, values in self.rows)
+
+
 class Prism:
 
     @staticmethod
@@ -1784,6 +3301,8 @@ class Prism:
         if sf is None:
             sf = s.f(l=len(self))
         if dims == 2:
+            if _is_int_list(sf.elements) and all(_is_int_list(n.elements) for n in self.val):
+                return Seq._of([sum(map(operator.mul, reversed(_trim_ints(n.elements)), sf.elements)) for n in self.val])
             return Seq([n.trim()[::-1].dot_product(sf) for n in self.val])
         elif dims == 3:
             return Matrix([p.signary_prism(s, sf) for p in self])
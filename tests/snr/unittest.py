@@ -1,6 +1,9 @@
 import unittest
-from cxr import Seq, Sig, x, Matrix, Prism, set_std_l
-from cxr.math import g_prism_identity, simplex_identity
+from unittest import mock
+from cxr import Seq, ModSeq, Sig, SigBatch, x, Matrix, SparseMatrix, Prism, set_std_l
+from cxr.math import g_prism_identity, simplex_identity, set_ntt_threshold, set_matrix_workers, set_parallel_threshold,\
+    precision, crt, signature_dot_product
+from cxr.math import snr
 
 
 class SeqTestCase(unittest.TestCase):
@@ -44,6 +47,44 @@ class SeqTestCase(unittest.TestCase):
 
         self.assertEqual(Seq(1, 2, 1).sqrt(), Seq(1, 1))
 
+    def test_mixed_types(self):
+        self.assertEqual(Seq(1, 2) + Seq(0.5, 1), Seq(1.5, 3))
+        self.assertEqual(Seq(1, 1) * Seq(0.5, 2), Seq(0.5, 2.5, 2))
+        self.assertEqual(Seq(1, 2, 3).dot_product(Seq(1.5, 1)), 3.5)
+        self.assertEqual(Seq(3, 1, 4).dot_product(Seq(1, 5, 9, 2)), 44)
+
+    def test_large_convolution(self):
+        a = Seq([(-3) ** k + k for k in range(120)])
+        b = Seq([k * k - 7 for k in range(90)])
+        self.addCleanup(set_ntt_threshold, snr.ntt_threshold)
+        set_ntt_threshold(10 ** 6)
+        school = a * b
+        set_ntt_threshold(16)
+        with mock.patch.object(snr, "_ntt_mul_ints", wraps=snr._ntt_mul_ints) as ntt:
+            self.assertEqual(a * b, school)
+        self.assertTrue(ntt.called)
+        self.assertEqual((Seq(1, 1) ** 60)[30], 118264581564861424)
+
+    def test_pow(self):
+        self.assertEqual(x ** 1000, Seq([0] * 1000 + [1]))
+        self.assertEqual(Seq(0, 0, 3) ** 3, Seq(0, 0, 0, 0, 0, 0, 27))
+        self.assertEqual(Seq(1, 1) ** 13, Seq(1, 1) ** 6 * Seq(1, 1) ** 7)
+        self.assertEqual(Seq(0.5, 1) ** 3, Seq(0.125, 0.75, 1.5, 1))
+        self.assertEqual(Seq(3, 4) ** 0, Seq(1))
+
+    def test_precision(self):
+        with precision(5):
+            self.assertEqual(Seq(1, 1) ** 10, Seq(1, 10, 45, 120, 210))
+            self.assertEqual(Seq(1) / Seq(1, -1), Seq(1, 1, 1, 1, 1))
+            self.assertEqual(len(Seq(1, 2, 1).sqrt()), 5)
+        self.assertEqual(len(Seq(1, 1) ** 10), 11)
+
+    def test_newton_division(self):
+        with precision(100):
+            fib = Seq(1) / Seq(1, -1, -1)
+        self.assertEqual(fib[99], 354224848179261915075)
+        self.assertEqual(Seq(0, 2, 4, 2) / Seq(0, -1, -1), Seq(-2, -2))
+
     def test_utilities(self):
         s = Seq(1, 1, 2, 0)
         s.append(-3)
@@ -74,6 +115,49 @@ class SeqTestCase(unittest.TestCase):
         self.assertEqual(Seq(1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 610).i(), Seq(1, 1))
         self.assertEqual(Seq(1, 1).f(seed=Seq(2, 1)), Seq(2, 1, 3, 4, 7, 11, 18, 29, 47, 76, 123, 199, 322, 521, 843))
 
+    def test_recurrence(self):
+        self.assertEqual(Seq(1, 1).f(l=20, seed=Seq(2, 1)).recurrence(), Seq(1, 1))
+        self.assertEqual(Seq(3, 0, -2).f(l=12, seed=Seq(5, 0, 7)).recurrence(modulus=11), Seq(3, 0, 9))
+        self.assertIsNone(Seq(1, 2, 4, 7, 11).recurrence())
+        td = Seq(3, -1, 4).f(l=14).td(12)
+        self.assertEqual(td.recurrence(), Seq(3, -1, 4).td(12))
+        self.assertEqual(td.recurrence(modulus=101), Seq(3, 100, 4).td(12))
+        self.assertEqual(Seq(2, -1, 3).f(l=40).i(), Seq(2, -1, 3))
+
+    def test_f_generator(self):
+        self.assertEqual(list(Seq(1, 1).f_generator(l=8)), [1, 2, 3, 5, 8, 13, 21])
+        self.assertEqual(list(Seq(1, 1, 1).f_generator(l=6, seed=Seq(0, 1))), [1, 2, 4, 7])
+        stream = Seq(2, 1).f_generator(l=None)
+        self.assertEqual([next(stream) for _ in range(1000)][-1], Seq(2, 1).f_nth(1000))
+
+    def test_f_nth(self):
+        self.assertEqual(Seq(1, 1).f_nth(14), 610)
+        self.assertEqual(Seq(1, 1).f_nth(14, seed=Seq(2, 1)), 843)
+        self.assertEqual(Seq(1, 1).f_nth(299), 222232244629420445529739893461909967206666939096499764990979600)
+        self.assertEqual(Seq(1, 1).f_nth(10 ** 6, modulus=10 ** 9 + 7), 534400663)
+        self.assertEqual(Seq(3, 0, 2).f_nth(40, modulus=97), Seq(3, 0, 2).f(l=41)[40] % 97)
+
+    def test_mod_seq(self):
+        p = 10007
+        d = ModSeq(1, 1, modulus=p)
+        self.assertEqual(d.f(l=40), Seq(1, 1).f(l=40) % p)
+        self.assertEqual(d.f(l=40).i(), Seq(1, 1))
+        self.assertEqual(ModSeq(1, modulus=p) / [1, -1, -1], d.f(l=30))
+        self.assertEqual(ModSeq(4, modulus=p) / 2, ModSeq(2, modulus=p))
+        self.assertEqual((d ** 9) * ModSeq(3, 5, modulus=p), (Seq(1, 1) ** 9 * Seq(3, 5)) % p)
+        self.assertEqual(Matrix.power(d, 25).f() % p, Matrix.power(Seq(1, 1), 25).f() % p)
+        m = Matrix.power(ModSeq(3, 5, modulus=7), 6)
+        self.assertTrue(all(isinstance(row, ModSeq) for row in m * m))
+        self.assertEqual((m ** 3)[5], (Matrix.power(Seq(3, 5), 6) ** 3)[5] % 7)
+        self.assertEqual((m + m)[4], (Matrix.power(Seq(3, 5), 6)[4] * 2) % 7)
+        trimmed = Matrix([ModSeq(1, 2, modulus=7), ModSeq(7, modulus=7)]) ** 2
+        self.assertEqual(len(trimmed), 1)
+        self.assertTrue(all(isinstance(row, ModSeq) for row in trimmed))
+
+        f = Seq(3, -1, 4).f(l=30)
+        primes = (10 ** 9 + 7, 998244353, 10 ** 9 + 9, 1000003, 999983, 65537)
+        self.assertEqual(crt(*[ModSeq(f, modulus=q) for q in primes], signed=True), f)
+
 
 
 class SigTestCase(unittest.TestCase):
@@ -91,12 +175,63 @@ class SigTestCase(unittest.TestCase):
         self.assertEqual(Sig(1, 1, 1) ** 2, Sig(1, 2, 4, 6, 8, 8, 6, 3, 1))
 
         self.assertEqual(Sig(1, 1).iter_add(3), Sig(3, 0, -5, 0, 3, 1))
+        self.assertEqual(Sig(1, 2).iter_add(7), Sig(1, 2).iter_add(3) + Sig(1, 2).iter_add(4))
+        self.assertEqual(Sig(1, 1).iter_add(-2)[:10], (Sig(0) - Sig(1, 1) - Sig(1, 1))[:10])
 
         self.assertEqual(Sig(1, 1).multiplicative_inverse(l=15), Sig(1, -1, 2, -5, 14, -42, 132, -429, 1430, -4862, 16796, -58786, 208012, -742900, 2674440))
 
+    def test_convolve(self):
+        a = Sig(1, 2, -1, 3)
+        b = Sig(2, 0, 1, 1, -2)
+        self.assertEqual(a.convolve(b, l=7), (a * b)[:7])
+        with precision(7):
+            self.assertEqual(a * b, (Sig(1, 2, -1, 3) * Sig(2, 0, 1, 1, -2))[:7])
+        self.assertEqual(len(Sig(1, 1).convolve(Sig([1] * 200), l=50)), 50)
+
+    def test_left_division(self):
+        s = Sig(2, -1, 0, 3, 1)
+        b = Sig(1, 1, -2, 0, 1)
+        self.assertEqual(s.convolve(b, l=60) // b, s)
+        self.assertEqual(Sig(1, 3, 3, -1, -3, -1) // Sig(1, 2, -1), Sig(1, 1))
+        self.assertEqual(Sig(2, 3, 2, 1) // Sig(2, 1), Sig(1, 1))
+        q = s.convolve(Sig(-1, 2, 1), l=40) // Sig(-1, 2, 1)
+        self.assertEqual(q, s)
+        self.assertTrue(all(type(e) is int for e in q))
+
+    def test_multiplicative_inverse(self):
+        a = Sig(1, 3, -2, 0, 5)
+        inverse = a.multiplicative_inverse(l=120)
+        self.assertEqual(len(inverse), 120)
+        self.assertEqual(a.convolve(inverse, l=120), Sig(1))
+        self.assertEqual(inverse.convolve(a, l=120), Sig(1))
+        self.assertEqual(Sig(2, 1).multiplicative_inverse(l=4), Sig(0.5, -0.125, 0.0625, -0.0390625))
+        self.assertEqual(Sig(2).multiplicative_inverse(), Sig(0.5))
+        self.assertEqual(Sig(2, 0).multiplicative_inverse(), Sig(0.5))
+        self.assertEqual(Sig(4, 0, 0).multiplicative_inverse(l=6), Sig(0.25))
+
+    def test_checked_operands(self):
+        self.assertEqual(Sig(1, 1) + [2, 1], Sig(3, 0, -3, -1))
+        self.assertEqual(Sig(1, 1) + Seq(2, 1), Sig(3, 0, -3, -1))
+        self.assertRaises(ValueError, lambda: Sig(1, 1) + ["2"])
+        with precision(3):
+            self.assertEqual(Sig(1, 1) + Sig(2, 1), Sig(3, 0, -3))
+
     def test_utilities(self):
         self.assertEqual(Sig(0, 0, 1, 1, 1).first_nonzero(), 2)
 
+    def test_batch(self):
+        a = SigBatch(Sig(1, 1), Sig(2, 0, 1), [3, -1])
+        b = SigBatch([1, 2], [0, 1], [-1, 1, 1])
+        self.assertEqual(list(a + b), [Sig(1, 1) + Sig(1, 2), Sig(2, 0, 1) + Sig(0, 1), Sig(3, -1) + Sig(-1, 1, 1)])
+        self.assertEqual(list(a * b), [Sig(1, 1) * Sig(1, 2), Sig(2, 0, 1) * Sig(0, 1), Sig(3, -1) * Sig(-1, 1, 1)])
+        self.assertEqual(a * Sig(1, 1), SigBatch([s * Sig(1, 1) for s in a]))
+        self.assertEqual(a.f(l=12)[1], Sig(2, 0, 1).f(l=12))
+        self.assertEqual(a.f(l=12).i(), a)
+        ragged = SigBatch([1, 1, 1], [1, 2, 1, -3, 1], [1, 3, 4, 7, 11, 18, 29])
+        self.assertEqual(list(ragged.i()), [Seq(1, 1, 1).i().sig(), Seq(1, 2, 1, -3, 1).i().sig(), Seq(1, 3, 4, 7, 11, 18, 29).i().sig()])
+        self.assertEqual(ragged[:1].i()[0], Seq(1, 1, 1).i().sig())
+        self.assertEqual(SigBatch.signature_dot_product([a, Sig(1, 1)], [b])[2],
+                         signature_dot_product([Seq(3, -1), Seq(1, 1)], [Seq(-1, 1, 1)]).sig())
 
 
 class MatrixTestCase(unittest.TestCase):
@@ -118,6 +253,103 @@ class MatrixTestCase(unittest.TestCase):
         self.assertEqual(m1.i(), Seq(1, 1))
 
 
+    def test_base_sequence(self):
+        m = Matrix.power(Seq(1, 1), l=6)
+        self.assertEqual(m.base_sequence(10), Seq(1, 11, 121, 1331, 14641, 161051))
+        self.assertEqual(Matrix.power(Seq(1, 1), l=200).base_sequence(10)[199], 11 ** 199)
+        td = Matrix([row.td(12) for row in m]).base_sequence(10)
+        self.assertEqual([int(v) for v in td], m.base_sequence(10).elements)
+        signed = Matrix([Seq(1, -2, 3), Seq(-1, 2), Seq(-3, 0, 1)])
+        self.assertEqual(signed.base_sequence(10), Seq(83, 8, 299))
+        td = Matrix([row.td(12) for row in signed]).base_sequence(10)
+        self.assertEqual([int(v) for v in td], [83, 8, 299])
+        self.assertFalse(any(v.is_negative for v in td))
+        self.assertEqual(Prism(m).signary_prism(Seq(1, 1)), Seq([sum(m[n][k] * Seq(1, 1).f(l=6)[k] for k in range(n + 1)) for n in range(6)]))
+
+    def test_antidiagonal_sum(self):
+        m = Matrix.power(Seq(1, 1), l=20)
+        self.assertEqual(m.f(), Seq(1, 1).f(l=20))
+        self.assertEqual(m.f(a=2), Seq(1, 0, 1).f(l=20))
+        g = Seq(2, 1)
+        self.assertEqual(m.f(g=g), Seq([sum(m[n - k][k] * g.f(l=20)[n - k] for k in range(n + 1)) for n in range(20)]))
+
+    def test_power_generator(self):
+        d = Seq(1, 2, 1)
+        self.assertEqual(list(Matrix.power_generator(d, l=10)), list(Matrix.power(d, l=10)))
+        rows = Matrix.power_generator(Seq(1, 1), l=None)
+        self.assertEqual([next(rows) for _ in range(41)][-1], Seq(1, 1) ** 40)
+        self.assertEqual(len(Matrix.power(Seq(1, 1, 1), l=20, w=7)[19]), 7)
+
+    def test_g_matrix(self):
+        m = Matrix.power(Seq(1, 2, 1), l=8)
+        g = [Seq(1, 1), Seq(1, 2)]
+        sigma = g[0].sig() + g[1].sig()
+        out = Matrix.g_matrix(m, g, l=8, w=10)
+        for n in range(8):
+            self.assertEqual(out[n], m[n][:10] + sum((out[n - k] * sigma[k - 1] for k in range(1, n + 1)), Seq(0)))
+
+    def test_sparse(self):
+        d = Seq(1, 0, 2, 0, 1)
+        m = Matrix.power(d, l=10)
+        s = SparseMatrix.power(d, l=10)
+        self.assertEqual(s, m)
+        self.assertEqual(s[4][6], m[4][6])
+        self.assertEqual(s.nnz(), sum(1 for row in m for e in row if e))
+        self.assertEqual(s.f(2), m.f(2))
+        self.assertEqual(s.sieve(2), m.sieve(2))
+        self.assertEqual(s.diagonalise(), m.diagonalise())
+        self.assertEqual(s * s, m * m)
+        self.assertEqual(SparseMatrix(m).dense(), m)
+
+    def test_riordan(self):
+        s, d = Seq(1, 2, 3, 4, 5, 6, 7, 8, 9, 10), Seq(1, -1, 2)
+        m = Matrix.riordan(s, d, l=10)
+        for n in range(2, 10):
+            self.assertEqual(m[n][1:], Seq([m[n - 1][k - 1:k + 2].dot_product(d[::-1]) for k in range(1, n + 1)]))
+        self.assertEqual(list(Matrix.riordan_columns(s, d, l=10)), [m.column(k) for k in range(10)])
+
+    def test_tall_sum(self):
+        a = Matrix([Seq(1), Seq(2), Seq(3), Seq(4)])
+        b = Matrix([Seq(1, 2)])
+        self.assertEqual(a + b, Matrix([Seq(2, 2), Seq(2, 0), Seq(3, 0), Seq(4, 0)]))
+        self.assertEqual(a + b, Matrix([Seq(1.0), Seq(2), Seq(3), Seq(4)]) + b)
+
+    def test_column_cache(self):
+        m = Matrix.power(Seq(1, 1), l=8)
+        self.assertEqual(m.column(2)[5], 10)
+        m[5][2] = 9
+        self.assertEqual(m.column(2)[5], 9)
+        self.assertEqual(m.transpose()[2][5], 9)
+        m.append(Seq(1, 8, 28))
+        self.assertEqual(m.column(2)[8], 28)
+        m[0] = Seq(2)
+        self.assertEqual((m * Matrix.identity(9))[0], Seq(2))
+
+    def test_product(self):
+        m = Matrix.power(Seq(1, 2), l=12)
+        self.assertEqual(m * Matrix.identity(12), m)
+        self.assertEqual((m * m)[5], Seq([sum(m[5][k] * m[k][y] for k in range(6)) for y in range(11)]))
+        self.assertEqual((m + m).trim(), m * 2)
+        self.assertEqual(m.transpose().column(3), m[3])
+
+    def test_parallel_product(self):
+        m = Matrix.power(Seq(1, 2, 1), l=16)
+        r = Matrix.riordan(Seq(1, 1, 2, 3, 5), Seq(1, 1), l=32)
+        self.assertEqual(m.parallel_product(r, workers=2), m * r)
+        self.addCleanup(set_matrix_workers, snr.matrix_workers)
+        self.addCleanup(set_parallel_threshold, snr.parallel_threshold)
+        serial = r * m, m ** 5
+        set_matrix_workers(2)
+        set_parallel_threshold(0)
+        self.assertEqual((r * m, m ** 5), serial)
+
+    def test_pow(self):
+        m = Matrix.power(Seq(1, 1), l=12)
+        self.assertEqual(m ** 3, Matrix.power(Seq(3, 1), l=12))
+        self.assertEqual(m ** 5, m * m * m * m * m)
+        self.assertEqual(m ** 1, m)
+        self.assertEqual(m ** 0, Matrix.identity(12))
+
     def test_utilities(self):
         l = set_std_l(15)
         m = Matrix.power(Seq(1, 1))